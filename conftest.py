@@ -0,0 +1 @@
+# Makes the packages in the repository root importable for the tests.
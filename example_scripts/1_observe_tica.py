@@ -19,7 +19,7 @@ feat = feat_init(args.top)
 
 tica, tica_output = get_tica(trajs, feat, files, lag=args.lag, var_cutoff=args.var_cutoff, ndims=args.ndims,
                              pipeline=args.pipeline, forceCalc=args.forceCalcTICA, forceModel=args.forceModelTICA,
-                             forceFeat=args.forceCalcFeat)
+                             forceFeat=args.forceCalcFeat, prefetch=args.prefetch, chunksize=args.chunksize)
 
 for offset in range(0, 12, 2):
     tica_plot(tica_output, offset, lag=tica.lag, output=args.directory)
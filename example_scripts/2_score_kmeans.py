@@ -18,7 +18,7 @@ feat = feat_init(args.top)
 
 tica, tica_output = get_tica(trajs, feat, files, lag=args.lag, var_cutoff=args.var_cutoff, ndims=args.ndims,
                              pipeline=args.pipeline, forceCalc=args.forceCalcTICA, forceModel=args.forceModelTICA,
-                             forceFeat=args.forceCalcFeat)
+                             forceFeat=args.forceCalcFeat, prefetch=args.prefetch, chunksize=args.chunksize)
 
 n_clustercenters = [2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
 score_kmeans(tica_output, n_clustercenters,
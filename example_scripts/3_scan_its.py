@@ -19,7 +19,7 @@ dtraj, dtraj_output = get_kmeans(trajs, feat, files,
                                  kclusters=args.kclusters, lag=args.lag, var_cutoff=args.var_cutoff, ndims=args.ndims,
                                  pipeline=args.pipeline, forceCalc=args.forceCalcClustering, forceModel=args.forceModelClustering,
                                  forceCalcTICA=args.forceCalcTICA, forceModelTICA=args.forceModelTICA,
-                                 forceFeat=args.forceCalcFeat)
+                                 forceFeat=args.forceCalcFeat, prefetch=args.prefetch, chunksize=args.chunksize)
 
 lags = [25, 50, 100, 250, 500, 750, 1000, 1250, 1500, 1750, 2000, 2250, 2500]
 its_scan(dtraj_output, lags, lag=args.lag, ndims=args.ndims, k=args.kclusters, path=args.directory)
@@ -0,0 +1,38 @@
+"""
+Example script that writes representative structures for each microstate and metastable set.
+"""
+import warnings
+
+warnings.filterwarnings("ignore")
+
+from ..util.io import parse
+from ..util.io import init
+from ..custom.features import feat_CA_dist as feat_init
+from ..wrapper.bmsm import get_bmsm
+from ..wrapper.kmeans import get_kmeans
+from ..wrapper.sample import get_state_index, sample_states, write_samples
+
+args, files = parse()
+trajs = init(args.prefix, args.suffix)
+feat = feat_init(args.top)
+
+dtraj, dtraj_output = get_kmeans(trajs, feat, files,
+                                 kclusters=args.kclusters, lag=args.lag, var_cutoff=args.var_cutoff, ndims=args.ndims,
+                                 pipeline=args.pipeline, forceCalc=args.forceCalcClustering, forceModel=args.forceModelClustering,
+                                 forceCalcTICA=args.forceCalcTICA, forceModelTICA=args.forceModelTICA,
+                                 forceFeat=args.forceCalcFeat, prefetch=args.prefetch, chunksize=args.chunksize)
+index = get_state_index(dtraj_output, files, nstates=args.kclusters)
+
+samples = sample_states(index, args.nsamples)
+write_samples(trajs, args.top, samples,
+              [args.directory + 'state-' + str(s) + '.xtc' for s in range(len(samples))])
+
+msm = get_bmsm(trajs, feat, files, msmlag=args.msmlag, kclusters=args.kclusters, lag=args.lag,
+               var_cutoff=args.var_cutoff, ndims=args.ndims, pipeline=args.pipeline,
+               prefetch=args.prefetch, chunksize=args.chunksize)
+msm.pcca(args.mstates)
+metastable_sets = [msm.active_set[s] for s in msm.metastable_sets]
+
+samples = sample_states(index, args.nsamples, states=metastable_sets)
+write_samples(trajs, args.top, samples,
+              [args.directory + 'metastable-' + str(s) + '.xtc' for s in range(len(samples))])
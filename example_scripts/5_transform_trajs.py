@@ -0,0 +1,19 @@
+"""
+Example script that discretizes new trajectories with the stored tICA and KMeans models.
+The trajectories are selected via prefix and suffix, the models are taken from the directory.
+"""
+import warnings
+
+warnings.filterwarnings("ignore")
+
+from ..util.io import parse
+from ..util.io import init
+from ..custom.features import feat_CA_dist as feat_init
+from ..wrapper.transform import transform_trajs
+
+args, files = parse()
+trajs = init(args.prefix, args.suffix)
+feat = feat_init(args.top)
+
+transform_trajs(trajs, feat, files, nworkers=args.nworkers, prefetch=args.prefetch, chunksize=args.chunksize,
+                force=args.forceTransform)
@@ -0,0 +1,32 @@
+import mdtraj
+import numpy as np
+import pyemma
+import pytest
+
+
+@pytest.fixture
+def md_data(tmp_path):
+    """Small random MD trajectories with a featurizer on all CA distances"""
+    top = mdtraj.Topology()
+    chain = top.add_chain()
+    for _ in range(5):
+        residue = top.add_residue('ALA', chain)
+        top.add_atom('CA', mdtraj.element.carbon, residue)
+
+    rng = np.random.default_rng(42)
+    topfile = str(tmp_path / 'top.pdb')
+    traj_list = []
+    for i, nframes in enumerate([120, 75, 230]):
+        xyz = rng.normal(size=(nframes, top.n_atoms, 3)).astype('float32')
+        traj = mdtraj.Trajectory(xyz, top)
+        if i == 0:
+            traj[0].save(topfile)
+        traj_list.append(str(tmp_path / 'run{}.xtc'.format(i)))
+        traj.save(traj_list[-1])
+
+    feat = pyemma.coordinates.featurizer(topfile)
+    feat.add_distances_ca(periodic=False, excluded_neighbors=0)
+
+    files = {'featTraj': str(tmp_path / 'feat_traj')}
+
+    return traj_list, feat, files, topfile
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from wrapper.feat import get_feat, stored_feat_files
+from wrapper.util import Forcer, load_manifest, save_manifest
+
+
+def test_get_feat_stores_and_loads(md_data):
+    traj_list, feat, files, _ = md_data
+    calculated = get_feat(traj_list, feat, files)
+
+    assert load_manifest(files['featTraj'])['complete']
+    assert [len(X) for X in calculated] == [120, 75, 230]
+
+    loaded = get_feat(traj_list, feat, files)
+    for X, Y in zip(calculated, loaded):
+        assert np.allclose(X, Y)
+
+
+def test_get_feat_resumes(md_data):
+    traj_list, feat, files, _ = md_data
+    calculated = get_feat(traj_list, feat, files)
+
+    manifest = load_manifest(files['featTraj'])
+    manifest['done'] = [0]
+    manifest['complete'] = False
+    save_manifest(files['featTraj'], manifest)
+    with pytest.raises(Forcer):
+        stored_feat_files(traj_list, files)
+
+    resumed = get_feat(traj_list, feat, files)
+    assert load_manifest(files['featTraj'])['done'] == [0, 1, 2]
+    for X, Y in zip(calculated, resumed):
+        assert np.allclose(X, Y)
+
+
+def test_stored_feat_files_compares_basenames(md_data, tmp_path, monkeypatch):
+    traj_list, feat, files, _ = md_data
+    get_feat(traj_list, feat, files)
+
+    monkeypatch.chdir(tmp_path)
+    relative = ['./' + traj.split('/')[-1] for traj in traj_list]
+    assert len(stored_feat_files(relative, files)) == 3
+    assert len(stored_feat_files([], files)) == 3
+
+    with pytest.raises(Forcer):
+        stored_feat_files(traj_list[:2], files)
+
+
+def test_get_feat_empty_traj_list_keeps_progress(md_data):
+    traj_list, feat, files, _ = md_data
+    get_feat(traj_list, feat, files)
+
+    manifest = load_manifest(files['featTraj'])
+    manifest['done'] = [0, 1]
+    manifest['complete'] = False
+    save_manifest(files['featTraj'], manifest)
+
+    with pytest.raises(ValueError):
+        get_feat([], feat, files)
+    assert load_manifest(files['featTraj']) == manifest
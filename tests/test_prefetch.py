@@ -0,0 +1,108 @@
+import numpy as np
+import pyemma
+import pytest
+
+from wrapper.prefetch import PrefetchReader, lagged_windows, map_chunks
+from wrapper.tica import get_tica
+from wrapper.kmeans import get_kmeans
+
+
+class ArrayReader:
+    """Minimal stand-in for a PyEMMA data source over in-memory arrays"""
+
+    def __init__(self, data, fail_at=None):
+        self.data = data
+        self.fail_at = fail_at
+
+    def number_of_trajectories(self):
+        return len(self.data)
+
+    def dimension(self):
+        return self.data[0].shape[1]
+
+    def output_type(self):
+        return self.data[0].dtype
+
+    def iterator(self, stride=1, chunk=None, return_trajindex=True):
+        nchunks = 0
+        for itraj, traj in enumerate(self.data):
+            traj = traj[::stride]
+            for start in range(0, len(traj), chunk):
+                if nchunks == self.fail_at:
+                    raise IOError("broken trajectory")
+                nchunks += 1
+                yield itraj, traj[start:start + chunk].copy()
+
+
+def frame_data(lengths):
+    return [np.arange(n, dtype='float32')[:, None] + 1000 * i for i, n in enumerate(lengths)]
+
+
+@pytest.mark.parametrize('prefetch', [0, 1, 3])
+def test_prefetch_reader_matches_iterator(prefetch):
+    reader = ArrayReader(frame_data([10, 0, 23, 7]))
+    expected = list(reader.iterator(chunk=4))
+    chunks = list(PrefetchReader(reader, chunksize=4, prefetch=prefetch))
+
+    assert [itraj for itraj, X in chunks] == [itraj for itraj, X in expected]
+    for (_, X), (_, Y) in zip(chunks, expected):
+        assert np.array_equal(X, Y)
+
+
+def test_prefetch_reader_raises_reader_errors():
+    reader = ArrayReader(frame_data([10, 10]), fail_at=3)
+    with pytest.raises(IOError):
+        list(PrefetchReader(reader, chunksize=2, prefetch=2))
+
+
+def test_prefetch_reader_early_exit():
+    reader = ArrayReader(frame_data([1000]))
+    chunks = iter(PrefetchReader(reader, chunksize=1, prefetch=2))
+    next(chunks)
+    chunks.close()  # Must not hang on the blocked reader thread.
+
+
+def test_lagged_windows_keep_all_pairs():
+    lag = 3
+    data = frame_data([20, 2, 11])
+    pairs = set()
+    for itraj, window in lagged_windows(ArrayReader(data).iterator(chunk=4), lag):
+        pairs.update(zip(window[:-lag, 0], window[lag:, 0]))
+
+    expected = set()
+    for traj in data:
+        expected.update(zip(traj[:-lag, 0], traj[lag:, 0]))
+    assert pairs == expected
+
+
+def test_map_chunks_empty_trajectory():
+    output = map_chunks(ArrayReader(frame_data([5, 0])), lambda X: X * 2, chunksize=2)
+
+    assert np.array_equal(output[0][:, 0], 2 * np.arange(5))
+    assert output[1].shape == (0, 1)
+    assert output[1].ndim == output[0].ndim
+    assert output[1].dtype == output[0].dtype
+
+    output = map_chunks(ArrayReader(frame_data([5, 0])), lambda X: X[:, 0].astype('int32'), chunksize=2)
+    assert output[1].ndim == 1
+    assert output[1].dtype == np.int32
+
+
+def test_stream_tica_matches_in_memory(md_data):
+    traj_list, feat, files, _ = md_data
+    tica_obj, tica_output = get_tica(traj_list, feat, files, lag=2, var_cutoff=1.0,
+                                     pipeline=True, prefetch=2, chunksize=13)
+
+    reference = pyemma.coordinates.tica(pyemma.coordinates.load(traj_list, features=feat),
+                                        lag=2, var_cutoff=1.0, kinetic_map=True)
+    assert np.allclose(tica_obj.eigenvalues, reference.eigenvalues, atol=1e-5)
+    assert [len(Y) for Y in tica_output] == [120, 75, 230]
+
+
+def test_stream_kmeans_odd_chunksize(md_data):
+    traj_list, feat, files, _ = md_data
+    cluster_obj, dtraj_output = get_kmeans(traj_list, feat, files, kclusters=3, lag=2, var_cutoff=1.0,
+                                           pipeline=True, prefetch=2, chunksize=37)
+
+    assert [len(dtraj) for dtraj in dtraj_output] == [120, 75, 230]
+    assert all(dtraj.max() < 3 for dtraj in dtraj_output)
@@ -0,0 +1,72 @@
+import mdtraj
+import numpy as np
+
+from wrapper.sample import build_state_index, get_state_index, state_frames, sample_states, write_samples
+
+
+def random_dtrajs(seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 4, size=n) for n in [50, 0, 17, 33]]
+
+
+def test_build_state_index_roundtrip():
+    dtrajs = random_dtrajs()
+    index = build_state_index(dtrajs, nstates=6)
+
+    assert len(index['offsets']) == 7
+    assert index['offsets'][-1] == sum(len(dtraj) for dtraj in dtrajs)
+    for state in range(6):
+        pairs = state_frames(index, state)
+        expected = [(itraj, frame) for itraj, dtraj in enumerate(dtrajs)
+                    for frame in np.flatnonzero(dtraj == state)]
+        assert [tuple(pair) for pair in pairs] == expected
+
+
+def test_get_state_index_storage(tmp_path, capsys):
+    files = {'stateIndex': str(tmp_path / 'state-index.npz')}
+    dtrajs = random_dtrajs()
+    index = get_state_index(dtrajs, files)
+    loaded = get_state_index(dtrajs, files)
+    assert "State index from storage" in capsys.readouterr().out
+    assert np.array_equal(index['pairs'], loaded['pairs'])
+
+    get_state_index(random_dtrajs(seed=1), files)  # stale index is rebuilt
+    assert capsys.readouterr().out.strip().endswith("State index from calculation")
+
+
+def test_get_state_index_nstates(tmp_path):
+    files = {'stateIndex': str(tmp_path / 'state-index.npz')}
+    dtrajs = random_dtrajs()
+    assert len(get_state_index(dtrajs, files)['offsets']) == 5
+    assert len(get_state_index(dtrajs, files, nstates=6)['offsets']) == 7
+    assert len(get_state_index(dtrajs, files, nstates=6)['offsets']) == 7
+
+
+def test_build_state_index_empty_dtrajs():
+    index = build_state_index([np.empty(0, dtype=int), np.empty(0, dtype=int)])
+
+    assert len(index['offsets']) == 1
+    assert sample_states(index, 5) == []
+
+
+def test_sample_states_empty_state():
+    index = build_state_index(random_dtrajs(), nstates=6)
+    samples = sample_states(index, 5, seed=0)
+    assert [len(sample) for sample in samples] == [5, 5, 5, 5, 0, 0]
+
+    samples = sample_states(index, 100, states=[0, [1, 2], 5], replace=False, seed=0)
+    assert [len(sample) for sample in samples] == [len(state_frames(index, 0)),
+                                                   len(state_frames(index, [1, 2])), 0]
+
+
+def test_write_samples(md_data, tmp_path):
+    traj_list, feat, files, topfile = md_data
+    samples = [np.array([[2, 200], [0, 3], [2, 10]]), np.empty((0, 2), dtype=int)]
+    outfiles = [str(tmp_path / 'state-0.pdb'), str(tmp_path / 'state-1.pdb')]
+    write_samples(traj_list, topfile, samples, outfiles)
+
+    written = mdtraj.load(outfiles[0])
+    for n, (itraj, frame) in enumerate(samples[0]):
+        expected = mdtraj.load_frame(traj_list[itraj], frame, top=topfile)
+        assert np.allclose(written.xyz[n], expected.xyz[0], atol=1e-3)
+    assert not (tmp_path / 'state-1.pdb').exists()
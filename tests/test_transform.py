@@ -0,0 +1,95 @@
+import os
+import shutil
+
+import numpy as np
+import pyemma
+import pytest
+
+from wrapper.kmeans import get_kmeans
+from wrapper.transform import dtraj_file, transform_trajs
+from wrapper.util import load_manifest, save_manifest
+
+
+@pytest.fixture
+def models(md_data, tmp_path):
+    traj_list, feat, files, _ = md_data
+    files.update({'ticaFile': str(tmp_path / 'TICA.npy'), 'ticaModel': str(tmp_path / 'tica-obj.npy'),
+                  'cumvarFile': str(tmp_path / 'CumVar.npy'), 'clusterFile': str(tmp_path / 'dTrajs.npy'),
+                  'clusterModel': str(tmp_path / 'cluster-obj.npy'),
+                  'transformDtraj': str(tmp_path / 'dTraj-')})
+    cluster_obj, dtraj_output = get_kmeans(traj_list[:2], feat, files, kclusters=3, lag=2, var_cutoff=1.0)
+
+    return traj_list, feat, files
+
+
+def test_transform_trajs_matches_models(models):
+    traj_list, feat, files = models
+    dtrajFile_list = transform_trajs(traj_list, feat, files, nworkers=2, chunksize=40)
+
+    tica_obj, cluster_obj = pyemma.load(files['ticaModel']), pyemma.load(files['clusterModel'])
+    for traj, dtrajFile in zip(traj_list, dtrajFile_list):
+        expected = cluster_obj.assign(tica_obj.transform(pyemma.coordinates.load(traj, features=feat)))
+        assert np.array_equal(np.load(dtrajFile), expected)
+
+    manifest = load_manifest(files['transformDtraj'])
+    assert manifest['trajs'][os.path.basename(dtrajFile_list[2])] == os.path.abspath(traj_list[2])
+
+
+def test_transform_trajs_is_incremental(models, capsys):
+    traj_list, feat, files = models
+    transform_trajs(traj_list[:2], feat, files, nworkers=2)
+    mtime = os.path.getmtime(dtraj_file(traj_list[0], files))
+
+    transform_trajs(traj_list, feat, files, nworkers=2)
+    assert "Transform 1 of 3 trajectories" in capsys.readouterr().out
+    assert os.path.getmtime(dtraj_file(traj_list[0], files)) == mtime
+    assert os.path.isfile(dtraj_file(traj_list[2], files))
+
+
+def test_transform_trajs_failure_keeps_finished(models, tmp_path):
+    traj_list, feat, files = models
+    broken = str(tmp_path / 'broken.xtc')
+    with open(broken, 'wb') as fh:
+        fh.write(b'not a trajectory')
+
+    with pytest.raises(RuntimeError):
+        transform_trajs([broken] + traj_list, feat, files, nworkers=1)
+
+    manifest = load_manifest(files['transformDtraj'])
+    finished = [traj for traj in traj_list if os.path.isfile(dtraj_file(traj, files))]
+    assert sorted(manifest['trajs'].values()) == sorted(os.path.abspath(traj) for traj in finished)
+
+
+def test_transform_trajs_unique_names(models, tmp_path):
+    traj_list, feat, files = models
+    os.mkdir(str(tmp_path / 'other'))
+    copy = shutil.copy(traj_list[0], str(tmp_path / 'other'))
+
+    with pytest.raises(ValueError):
+        transform_trajs([traj_list[0], copy], feat, files)
+
+
+def test_transform_trajs_same_name_other_directory(models, tmp_path):
+    traj_list, feat, files = models
+    for day in ['day1', 'day2']:
+        os.mkdir(str(tmp_path / day))
+    day1 = shutil.copy(traj_list[0], str(tmp_path / 'day1' / 'run.xtc'))
+    day2 = shutil.copy(traj_list[1], str(tmp_path / 'day2' / 'run.xtc'))
+
+    transform_trajs([day1], feat, files, nworkers=1)
+    with pytest.raises(ValueError):
+        transform_trajs([day2], feat, files, nworkers=1)
+    assert len(np.load(dtraj_file(day1, files))) == 120
+
+
+def test_transform_trajs_redoes_unrecorded(models, capsys):
+    traj_list, feat, files = models
+    transform_trajs(traj_list, feat, files, nworkers=2)
+
+    manifest = load_manifest(files['transformDtraj'])
+    del manifest['trajs'][os.path.basename(dtraj_file(traj_list[1], files))]
+    save_manifest(files['transformDtraj'], manifest)
+
+    transform_trajs(traj_list, feat, files, nworkers=2)
+    assert "Transform 1 of 3 trajectories" in capsys.readouterr().out
+    assert len(load_manifest(files['transformDtraj'])['trajs']) == 3
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pyemma
+
+from wrapper.util import atomic_save, atomic_save_model, load_manifest, save_manifest, \
+    start_stage, mark_done, stage_done
+
+
+def test_atomic_save_leaves_no_tmpfile(tmp_path):
+    filename = str(tmp_path / 'data.npy')
+    atomic_save(filename, np.arange(10))
+
+    assert np.array_equal(np.load(filename), np.arange(10))
+    assert not os.path.exists(filename + '.tmp')
+
+
+def test_manifest_roundtrip(tmp_path):
+    filename = str(tmp_path / 'TICA.npy')
+    assert load_manifest(filename) is None
+
+    save_manifest(filename, {'done': [1, 2], 'complete': False})
+    assert load_manifest(filename) == {'done': [1, 2], 'complete': False}
+
+
+def test_stage_progress(tmp_path):
+    filename = str(tmp_path / 'TICA.npy')
+    assert stage_done(filename)  # older runs without manifest
+
+    start_stage(filename)
+    assert not stage_done(filename)
+    assert not stage_done(filename, 'ticaModel')
+
+    mark_done(filename, 'ticaModel')
+    assert stage_done(filename, 'ticaModel')
+    assert not stage_done(filename)
+
+    mark_done(filename)
+    assert stage_done(filename)
+
+
+def test_atomic_save_model_keeps_other_models(tmp_path):
+    filename = str(tmp_path / 'models.h5')
+    data = np.random.default_rng(0).normal(size=(100, 3))
+    tica_obj = pyemma.coordinates.tica(data, lag=1)
+    tica_obj.save(filename, model_name='other')
+
+    atomic_save_model(tica_obj, filename)
+
+    assert set(pyemma.list_models(filename)) == {'default', 'other'}
+    assert not os.path.exists(filename + '.tmp')
@@ -26,6 +26,7 @@ def parse():
 
     parser.add_argument('-smp', '--smplen', type=int, default=2)
     parser.add_argument('-off', '--offset', type=int, default=0)
+    parser.add_argument('-ns', '--nsamples', type=int, default=10)
 
     parser.add_argument('-fF', '--forceCalcFeat', default=False, action='store_true')
     parser.add_argument('-fT', '--forceCalcTICA', default=False, action='store_true')
@@ -33,7 +34,11 @@ def parse():
     parser.add_argument('-fC', '--forceCalcClustering', default=False, action='store_true')
     parser.add_argument('-fmC', '--forceModelClustering', default=False, action='store_true')
     parser.add_argument('-fM', '--forceCalcMSM', default=False, action='store_true')
+    parser.add_argument('-fX', '--forceTransform', default=False, action='store_true')
     parser.add_argument('-pipe', '--pipeline', default=False, action='store_true')
+    parser.add_argument('-pf', '--prefetch', type=int, default=2)
+    parser.add_argument('-nw', '--nworkers', type=int, default=4)
+    parser.add_argument('-cs', '--chunksize', type=int, default=5000)
 
     parser.add_argument('-Ftraj', '--FeatureTraj', type=str, default='Feature/feat_traj')
     parser.add_argument('-CV', '--CumVarFile', type=str, default='tICA/CumVar')
@@ -41,7 +46,9 @@ def parse():
     parser.add_argument('-TM', '--tICAModel', type=str, default='tICA/tica-obj')
     parser.add_argument('-C', '--ClusterFile', type=str, default='KMeans/dTrajs')
     parser.add_argument('-CM', '--ClusterModel', type=str, default='KMeans/cluster-obj')
+    parser.add_argument('-SI', '--StateIndex', type=str, default='KMeans/state-index')
     parser.add_argument('-MM', '--MarkovModel', type=str, default='MSM/msm-obj')
+    parser.add_argument('-X', '--TransformDtraj', type=str, default='Transform/dTraj')
 
     args = parser.parse_args()
 
@@ -54,6 +61,10 @@ def parse():
     files["clusterFile"] += '-' + str(args.lag) + '-' + str(args.ndims) + '-' + str(args.kclusters) + '.npy'
     files["clusterModel"] = args.directory + args.ClusterModel
     files["clusterModel"] += '-' + str(args.lag) + '-' + str(args.ndims) + '-' + str(args.kclusters) + '.npy'
+    files["stateIndex"] = args.directory + args.StateIndex
+    files["stateIndex"] += '-' + str(args.lag) + '-' + str(args.ndims) + '-' + str(args.kclusters) + '.npz'
+    files["transformDtraj"] = args.directory + args.TransformDtraj
+    files["transformDtraj"] += '-' + str(args.lag) + '-' + str(args.ndims) + '-' + str(args.kclusters) + '-'
     files["msmModel"] = args.directory + args.MarkovModel
     files["msmModel"] += '-' + str(args.lag) + '-' + str(args.ndims) + '-' + str(args.kclusters)
     files["msmModel"] += '-' + str(args.msmlag) + '.npy'
@@ -1,12 +1,12 @@
 import pyemma
 
-from .util import Forcer
+from .util import Forcer, atomic_save_model
 from .kmeans import get_kmeans
 
 
 def get_bmsm(traj_list, feat, files, msmlag=2, kclusters=2, lag=2, var_cutoff=0.95, ndims=1e6,
             forceBMSM=False, pipeline=False,  forceCalcKmeans=False, forceModelKmeans=False,
-            forceCalcTICA=False, forceModelTICA=False, forceFeat=False):
+            forceCalcTICA=False, forceModelTICA=False, forceFeat=False, prefetch=2, chunksize=5000):
     """Wrapper for Markov state modeling
 
     We choose different sources based on user decision and available
@@ -50,6 +50,10 @@ def get_bmsm(traj_list, feat, files, msmlag=2, kclusters=2, lag=2, var_cutoff=0.
         Whether tICA should be remodeled
     forceFeat : bool
         Whether features should be recalculated.
+    prefetch : int (2)
+        Number of chunks read ahead in pipelining and featurization.
+    chunksize : int (5000)
+        Number of frames per chunk.
     """
     try:
         if forceFeat or forceCalcTICA or forceModelTICA or forceCalcKmeans or forceModelKmeans or forceBMSM:
@@ -64,9 +68,10 @@ def get_bmsm(traj_list, feat, files, msmlag=2, kclusters=2, lag=2, var_cutoff=0.
         dtraj, dtraj_output = get_kmeans(traj_list, feat, files,
                                          kclusters=kclusters, lag=lag, var_cutoff=var_cutoff, ndims=ndims,
                                          pipeline=pipeline, forceCalc=forceCalcKmeans, forceModel=forceModelKmeans,
-                                         forceCalcTICA=forceCalcTICA, forceModelTICA=forceModelTICA, forceFeat=forceFeat)
+                                         forceCalcTICA=forceCalcTICA, forceModelTICA=forceModelTICA, forceFeat=forceFeat,
+                                         prefetch=prefetch, chunksize=chunksize)
 
         msm_obj = pyemma.msm.bayesian_markov_model(dtraj_output, lag=msmlag, dt_traj='0.02 ns')
-        msm_obj.save(files["msmModel"])
+        atomic_save_model(msm_obj, files["msmModel"])
 
         return msm_obj
\ No newline at end of file
@@ -1,9 +1,60 @@
+import os
 import pyemma
 import numpy as np
 
 from glob import glob
 
-from .util import Forcer
+from .util import Forcer, atomic_save, load_manifest, save_manifest
+from .prefetch import PrefetchReader
+
+
+def same_trajs(traj_list, other_list):
+    """Whether two trajectory lists name the same trajectories
+
+    Only the number and the base names of the files are compared, so
+    relative and absolute paths to the same data are accepted.
+
+    Parameters
+    ----------
+    traj_list : list of strings
+        MD trajectory file names
+    other_list : list of strings
+        MD trajectory file names, e.g. from a progress manifest
+    """
+    return [os.path.basename(traj) for traj in traj_list] == [os.path.basename(traj) for traj in other_list]
+
+
+def stored_feat_files(traj_list, files):
+    """Feature files of a completely featurized data set
+
+    Raises Forcer if the feature files on storage are incomplete, e.g.
+    from a job that was killed during featurization. If traj_list is
+    empty, the stored features are used without checking against the
+    trajectories.
+
+    Parameters
+    ----------
+    traj_list : list of strings
+        MD trajectory file names
+    files : dict
+        File names for data in or to storage.
+        Important:
+        - files['featTraj']
+    """
+    manifest = load_manifest(files['featTraj'])
+    if manifest is not None:
+        if not manifest['complete'] or (traj_list and not same_trajs(traj_list, manifest['trajs'])):
+            raise Forcer()
+        ntrajs = len(manifest['trajs'])
+    else:  # Features of older runs without manifest.
+        ntrajs = len(traj_list) if traj_list else len(glob(files['featTraj'] + '*.npy'))
+
+    featFile_list = [files['featTraj'] + str(i) + '.npy' for i in range(ntrajs)]
+    if not featFile_list or not all(os.path.isfile(featFile) for featFile in featFile_list):
+        raise Forcer()
+
+    return featFile_list
+
 
 def pipe_feat(traj_list, feat, files, force=False):
     """Initiate pipeline with featurization
@@ -30,7 +81,7 @@ def pipe_feat(traj_list, feat, files, force=False):
         if force:
             raise Forcer()
 
-        featFile_list = sorted(glob(files['featTraj'] + '*.npy'))
+        featFile_list = stored_feat_files(traj_list, files)
         inp = pyemma.coordinates.source(featFile_list)
         pipe.add_element(inp)
         print("Add features to pipeline.")
@@ -46,7 +97,46 @@ def pipe_feat(traj_list, feat, files, force=False):
         return pipe
 
 
-def get_feat(traj_list, feat, files, force=False):
+def source_feat(traj_list, feat, files, force=False, chunksize=5000):
+    """Create a chunk-wise readable feature source
+
+    The source reads from feature files if these are complete on
+    storage and featurizes the MD trajectories otherwise. It is
+    consumed by the prefetching stages.
+
+    Parameters
+    ----------
+    traj_list : list of strings
+        MD trajectory file names
+    feat : class pyemma.coordinate.Featurize
+       User specified features.
+    files : dict
+        File names for data in or to storage.
+        Important:
+        - files['featTraj']
+    force : bool
+        Whether features should be recalculated.
+    chunksize : int (5000)
+        Number of frames per chunk.
+    """
+    try:
+        if force:
+            raise Forcer()
+
+        featFile_list = stored_feat_files(traj_list, files)
+        inp = pyemma.coordinates.source(featFile_list, chunksize=chunksize)
+        print("Stream features from storage.")
+
+        return inp
+
+    except:
+        inp = pyemma.coordinates.source(traj_list, features=feat, chunksize=chunksize)
+        print("Stream features from featurizer.")
+
+        return inp
+
+
+def get_feat(traj_list, feat, files, force=False, prefetch=2, chunksize=5000):
     """Wrapper for featurization
 
     We choose different sources based on user decision and available
@@ -67,6 +157,10 @@ def get_feat(traj_list, feat, files, force=False):
         - files['featTraj']
     force : bool
         Whether features should be recalculated.
+    prefetch : int (2)
+        Number of chunks read ahead during featurization.
+    chunksize : int (5000)
+        Number of frames per chunk.
     """
     ######################################################
     # Push featurized trajectories fully into memory ...
@@ -74,16 +168,58 @@ def get_feat(traj_list, feat, files, force=False):
         if force:
             raise Forcer()
 
-        featFile_list = sorted(glob(files['featTraj'] + '*.npy'))
+        featFile_list = stored_feat_files(traj_list, files)
         feat_output = [np.array(np.load((featFile)), dtype='float32') for featFile in featFile_list]
         print("Features from storage")
 
         return feat_output
     # ... from data ...
     except:
-        feat_output = pyemma.coordinates.load(traj_list, features=feat)
-        for i in range(len(feat_output)):
-            np.save(files['featTraj'] + str(i) + '.npy', feat_output[i])
+        if not traj_list:  # Nothing to featurize, keep the progress of earlier runs.
+            raise ValueError("No trajectories given and no complete features stored at " + files['featTraj'])
+
+        manifest = None if force else load_manifest(files['featTraj'])
+        if manifest is None or not same_trajs(traj_list, manifest['trajs']):
+            manifest = {'trajs': list(traj_list), 'done': [], 'complete': False}
+        manifest['trajs'] = list(traj_list)
+        manifest['complete'] = False
+        save_manifest(files['featTraj'], manifest)
+
+        featFile_list = [files['featTraj'] + str(i) + '.npy' for i in range(len(traj_list))]
+        todo = [i for i in range(len(traj_list))
+                if i not in manifest['done'] or not os.path.isfile(featFile_list[i])]
+        feat_output = [None if i in todo else np.array(np.load(featFile_list[i]), dtype='float32')
+                       for i in range(len(traj_list))]
+
+        def store(i, data):
+            feat_output[i] = data
+            atomic_save(featFile_list[i], data)
+            if i not in manifest['done']:
+                manifest['done'].append(i)
+            save_manifest(files['featTraj'], manifest)
+
+        if todo:
+            reader = pyemma.coordinates.source([traj_list[i] for i in todo], features=feat, chunksize=chunksize)
+            lengths = reader.trajectory_lengths()
+            for itraj in np.flatnonzero(lengths == 0):  # These never yield a chunk.
+                store(todo[itraj], np.empty((0, reader.dimension()), dtype='float32'))
+
+            pieces, nframes = [], 0
+            for itraj, X in PrefetchReader(reader, chunksize=chunksize, prefetch=prefetch):
+                pieces.append(X)
+                nframes += len(X)
+                if nframes < lengths[itraj]:
+                    continue
+
+                store(todo[itraj], np.concatenate(pieces))
+                pieces, nframes = [], 0
+
+        missing = [traj_list[i] for i in range(len(traj_list)) if feat_output[i] is None]
+        if missing:
+            raise RuntimeError("Featurization incomplete for " + ', '.join(missing))
+
+        manifest['complete'] = True
+        save_manifest(files['featTraj'], manifest)
         print("Features from calculation")
 
         return feat_output
@@ -1,13 +1,14 @@
 import pyemma
 import numpy as np
 
-from .util import Forcer
-from .tica import pipe_tica, get_tica
+from .util import Forcer, atomic_save, atomic_save_model, start_stage, mark_done, stage_done
+from .tica import pipe_tica, stream_tica, get_tica
+from .prefetch import PrefetchReader, map_chunks
 
 
 def get_kmeans(traj_list, feat, files, kclusters=2, lag=2, var_cutoff=0.95, ndims=1e6,
                pipeline=False, forceCalc=False, forceModel=False,
-               forceCalcTICA=False, forceModelTICA=False, forceFeat=False):
+               forceCalcTICA=False, forceModelTICA=False, forceFeat=False, prefetch=2, chunksize=5000):
     """Wrapper for KMeans clustering
 
     We choose different sources based on user decision and available
@@ -16,6 +17,10 @@ def get_kmeans(traj_list, feat, files, kclusters=2, lag=2, var_cutoff=0.95, ndim
     data from storage. If the data can not be found on storage, it is
     calculated from a stored model or newly created model.
 
+    Artifacts are stored atomically and tracked in a progress manifest
+    next to files['clusterFile']. If a job was killed after storing the
+    model, the next run resumes from the model.
+
     Parameters
     ----------
     traj_list : list of strings
@@ -48,10 +53,30 @@ def get_kmeans(traj_list, feat, files, kclusters=2, lag=2, var_cutoff=0.95, ndim
         Whether tICA should be remodeled
     forceFeat : bool
         Whether features should be recalculated.
+    prefetch : int (2)
+        Number of chunks read ahead in pipelining and featurization,
+        0 falls back to the PyEMMA pipeline.
+    chunksize : int (5000)
+        Number of frames per chunk.
     """
     ###############################################################
     # Create clustering object if memory is too small for data
     ###############################################################
+    if pipeline and prefetch > 0:
+        inp, tica_obj = stream_tica(traj_list, feat, files, lag=lag, var_cutoff=var_cutoff, forceFeat=False,
+                                    prefetch=prefetch, chunksize=chunksize)
+
+        # Only every 50th frame is read and kept in memory.
+        chunks = PrefetchReader(inp, chunksize=chunksize, prefetch=prefetch, stride=50)
+        samples = np.concatenate([tica_obj.transform(X) for itraj, X in chunks])
+
+        cluster_obj = pyemma.coordinates.cluster_kmeans(samples, k=kclusters, max_iter=500)
+        dtraj_output = map_chunks(inp, lambda X: cluster_obj.assign(tica_obj.transform(X)),
+                                  chunksize=chunksize, prefetch=prefetch)
+        print("Clusters from prefetched stream.")
+
+        return cluster_obj, dtraj_output
+
     if pipeline:
         pipe = pipe_tica(traj_list, feat, files, lag=lag, var_cutoff=var_cutoff, forceFeat=False)
         cluster_obj = pyemma.coordinates.cluster_kmeans(k=kclusters,
@@ -66,7 +91,8 @@ def get_kmeans(traj_list, feat, files, kclusters=2, lag=2, var_cutoff=0.95, ndim
     # Get discrete trajectories ...
     try:
         try:
-            if forceFeat or forceCalcTICA or forceModelTICA or forceCalc or forceModel:
+            if forceFeat or forceCalcTICA or forceModelTICA or forceCalc or forceModel \
+                    or not stage_done(files['clusterFile']):
                 raise Forcer()
 
             cluster_obj = pyemma.load(files['clusterModel'])
@@ -77,27 +103,37 @@ def get_kmeans(traj_list, feat, files, kclusters=2, lag=2, var_cutoff=0.95, ndim
             return cluster_obj, dtraj_output
         # ... from model ...
         except:
-            if forceFeat or forceCalcTICA or forceModelTICA or forceCalc:
+            if forceFeat or forceCalcTICA or forceModelTICA or forceCalc \
+                    or not stage_done(files['clusterFile'], 'clusterModel'):
                 raise Forcer()
 
             cluster_obj = pyemma.load(files['clusterModel'])
             tica_obj, tica_output = get_tica(traj_list, feat, files, lag=lag, var_cutoff=var_cutoff, ndims=ndims,
-                                             forceModel=forceModelTICA, forceCalc=forceCalcTICA, forceFeat=forceFeat)
+                                             forceModel=forceModelTICA, forceCalc=forceCalcTICA, forceFeat=forceFeat,
+                                             prefetch=prefetch, chunksize=chunksize)
             dtraj_output = cluster_obj.transform(tica_output)
             print("Clusters from model")
 
+            if not stage_done(files['clusterFile']):
+                atomic_save(files['clusterFile'], dtraj_output)
+                mark_done(files['clusterFile'])
+
             return cluster_obj, dtraj_output
     # ... from calculation ...
     except:
         tica_obj, tica_output = get_tica(traj_list, feat, files, lag=lag, var_cutoff=var_cutoff, ndims=ndims,
-                                         forceModel=forceModelTICA, forceCalc=forceCalcTICA, forceFeat=forceFeat)
+                                         forceModel=forceModelTICA, forceCalc=forceCalcTICA, forceFeat=forceFeat,
+                                         prefetch=prefetch, chunksize=chunksize)
 
         cluster_obj = pyemma.coordinates.cluster_kmeans(tica_output, k=kclusters,
                                                         max_iter=500, stride=50)
         dtraj_output = cluster_obj.dtrajs
 
-        cluster_obj.save(files['clusterModel'], overwrite=True)
-        np.save(files['clusterFile'], dtraj_output)
+        start_stage(files['clusterFile'])
+        atomic_save_model(cluster_obj, files['clusterModel'])
+        mark_done(files['clusterFile'], 'clusterModel')
+        atomic_save(files['clusterFile'], dtraj_output)
+        mark_done(files['clusterFile'])
         print("Clusters from calculation")
 
         return cluster_obj, dtraj_output
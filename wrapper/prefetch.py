@@ -0,0 +1,133 @@
+import queue
+import threading
+
+import numpy as np
+
+
+_DONE = object()
+
+
+class PrefetchReader:
+    """Iterate chunks of a PyEMMA data source with background read-ahead
+
+    A reader thread reads the next chunks into a bounded queue while
+    the caller computes on the current one, thus, file system reads
+    overlap with computation. Iterating yields (itraj, X) tuples like
+    the PyEMMA iterators do. PyEMMA allocates every chunk freshly, so
+    the chunks can be kept without copying; the queue only bounds the
+    memory of the read-ahead.
+
+    Parameters
+    ----------
+    reader : class pyemma.coordinates.data.DataSource
+        Source of trajectory or feature data.
+    chunksize : int (5000)
+        Number of frames per chunk.
+    prefetch : int (2)
+        Number of chunks read ahead. With 0 the chunks are read in the
+        calling thread without read-ahead.
+    stride : int (1)
+        Stride for reading the data.
+    """
+
+    def __init__(self, reader, chunksize=5000, prefetch=2, stride=1):
+        self.reader = reader
+        self.chunksize = chunksize
+        self.prefetch = prefetch
+        self.stride = stride
+
+    def _chunks(self):
+        return self.reader.iterator(stride=self.stride, chunk=self.chunksize, return_trajindex=True)
+
+    def _read(self, chunks, stop):
+        def put(item):
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for item in self._chunks():
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as err:
+            put(err)
+
+    def __iter__(self):
+        if self.prefetch < 1:
+            for itraj, X in self._chunks():
+                yield itraj, X
+            return
+
+        chunks = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        thread = threading.Thread(target=self._read, args=(chunks, stop), daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = chunks.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+
+def lagged_windows(chunks, lag):
+    """Prepend each chunk with the last lag frames of its predecessor
+
+    Time-lagged pairs (t, t + lag) within the windows are the same as
+    within the whole trajectories and the instantaneous frames of the
+    windows do not overlap. Windows with at most lag frames hold no
+    pair and are skipped.
+
+    Parameters
+    ----------
+    chunks : iterable of (itraj, X) tuples
+        Chunks in trajectory order, e.g. a PrefetchReader.
+    lag : int
+        Lagtime in frames.
+    """
+    current, carry = None, None
+    for itraj, X in chunks:
+        window = X if itraj != current else np.concatenate([carry, X])
+        current, carry = itraj, window[len(window) - lag:]
+        if len(window) > lag:
+            yield itraj, window
+
+
+def map_chunks(reader, func, chunksize=5000, prefetch=2):
+    """Apply a function chunk-wise and collect the results per trajectory
+
+    Trajectories without any frames give the result of func on an
+    empty chunk, so shape and dtype match the other trajectories.
+
+    Parameters
+    ----------
+    reader : class pyemma.coordinates.data.DataSource
+        Source of trajectory or feature data.
+    func : callable
+        Maps a chunk to a new array.
+    chunksize : int (5000)
+        Number of frames per chunk.
+    prefetch : int (2)
+        Number of chunks read ahead.
+    """
+    output = [[] for _ in range(reader.number_of_trajectories())]
+    for itraj, X in PrefetchReader(reader, chunksize=chunksize, prefetch=prefetch):
+        output[itraj].append(func(X))
+
+    for traj in output:
+        if not traj:
+            traj.append(func(np.empty((0, reader.dimension()), dtype=reader.output_type())))
+
+    return [np.concatenate(traj) for traj in output]
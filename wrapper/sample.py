@@ -0,0 +1,175 @@
+import zlib
+
+import mdtraj
+import numpy as np
+
+from .util import Forcer, atomic_savez
+
+
+def _flatten(dtraj_output):
+    lengths = np.array([np.size(dtraj) for dtraj in dtraj_output], dtype='int64')
+    states = np.ascontiguousarray(np.concatenate([np.ravel(dtraj) for dtraj in dtraj_output]), dtype='int32')
+    checksum = np.array(zlib.crc32(states), dtype='int64')
+
+    return states, lengths, checksum
+
+
+def build_state_index(dtraj_output, nstates=None):
+    """Inverted index from cluster states to (trajectory, frame) pairs
+
+    The index is built in a single vectorized pass over all discrete
+    trajectories. The frames of state s are
+    index['pairs'][index['offsets'][s]:index['offsets'][s + 1]],
+    sorted by trajectory and frame.
+
+    Parameters
+    ----------
+    dtraj_output : list of numpy.ndarrays
+        discrete trajectories
+    nstates : int (None)
+        Number of cluster states, if None the largest state plus one.
+    """
+    states, lengths, checksum = _flatten(dtraj_output)
+    if nstates is None:
+        nstates = states.max() + 1 if len(states) else 0
+
+    starts = np.cumsum(lengths) - lengths
+    trajs = np.repeat(np.arange(len(lengths)), lengths)
+    frames = np.arange(len(states)) - np.repeat(starts, lengths)
+    order = np.argsort(states, kind='stable')
+
+    index = {}
+    index['pairs'] = np.column_stack([trajs[order], frames[order]])
+    index['offsets'] = np.concatenate([[0], np.cumsum(np.bincount(states, minlength=nstates))])
+    index['lengths'] = lengths
+    index['checksum'] = checksum
+
+    return index
+
+
+def get_state_index(dtraj_output, files, nstates=None, force=False):
+    """Wrapper for the state-to-frame index
+
+    We try to retrieve the index from storage. If it can not be found
+    or does not belong to the given discrete trajectories, it is built
+    and stored next to the clustering data.
+
+    Parameters
+    ----------
+    dtraj_output : list of numpy.ndarrays
+        discrete trajectories
+    files : dict
+        File names for data in or to storage.
+        Important:
+        - files['stateIndex']
+    nstates : int (None)
+        Number of cluster states, if None the largest state plus one.
+    force : bool (False)
+        Whether the index should be rebuilt.
+    """
+    try:
+        if force:
+            raise Forcer()
+
+        with np.load(files['stateIndex']) as data:
+            index = {key: data[key] for key in data.files}
+        states, lengths, checksum = _flatten(dtraj_output)
+        if not np.array_equal(index['lengths'], lengths) or index['checksum'] != checksum:
+            raise Forcer()
+        if nstates is not None and len(index['offsets']) - 1 != nstates:
+            raise Forcer()
+        print("State index from storage")
+
+        return index
+
+    except:
+        index = build_state_index(dtraj_output, nstates=nstates)
+        atomic_savez(files['stateIndex'], **index)
+        print("State index from calculation")
+
+        return index
+
+
+def state_frames(index, states):
+    """All (trajectory, frame) pairs of a state or a set of states
+
+    Parameters
+    ----------
+    index : dict
+        State-to-frame index, see build_state_index
+    states : int or list of int
+        Cluster state or set of cluster states, e.g. a metastable set.
+    """
+    offsets, pairs = index['offsets'], index['pairs']
+    return np.concatenate([pairs[:0]] + [pairs[offsets[s]:offsets[s + 1]] for s in np.atleast_1d(states)])
+
+
+def sample_states(index, nsamples, states=None, replace=True, seed=None):
+    """Draw random (trajectory, frame) pairs for each state
+
+    Parameters
+    ----------
+    index : dict
+        State-to-frame index, see build_state_index
+    nsamples : int
+        Number of samples per state
+    states : list of int or list of lists of int (None)
+        States or sets of states to sample, if None all cluster states.
+        Metastable sets of an MSM index its active set and have to be
+        mapped to cluster states first, e.g.
+        [msm_obj.active_set[s] for s in msm_obj.metastable_sets].
+    replace : bool (True)
+        Whether to sample with replacement. Without replacement, states
+        with less than nsamples frames return all of their frames.
+        States without frames return no samples.
+    seed : int (None)
+        Seed of the random number generator.
+    """
+    if states is None:
+        states = range(len(index['offsets']) - 1)
+
+    rng = np.random.default_rng(seed)
+    samples = []
+    for state in states:
+        frames = state_frames(index, state)
+        size = nsamples if replace and len(frames) else min(nsamples, len(frames))
+        samples.append(frames[rng.choice(len(frames), size=size, replace=replace)])
+
+    return samples
+
+
+def write_samples(traj_list, topfile, samples, outfiles):
+    """Write sampled frames to one structure file per state
+
+    All requested frames are grouped by trajectory and read in sorted
+    order, so every trajectory is opened once and only seeked forward.
+
+    Parameters
+    ----------
+    traj_list : list of strings
+        MD trajectory file names
+    topfile : string
+        name of topology (.gro) file
+    samples : list of numpy.ndarrays
+        (trajectory, frame) pairs per state, see sample_states
+    outfiles : list of strings
+        Output file name per state, states without samples are skipped.
+    """
+    top = mdtraj.load_topology(topfile)
+
+    requested = np.unique(np.concatenate(samples), axis=0)
+    splits = np.flatnonzero(np.diff(requested[:, 0])) + 1
+    frames = {}
+    for pairs in np.split(requested, splits):
+        if len(pairs) == 0:
+            continue
+        with mdtraj.open(traj_list[pairs[0, 0]]) as fh:
+            for itraj, frame in pairs:
+                fh.seek(frame)
+                frames[(itraj, frame)] = fh.read_as_traj(top, n_frames=1)
+
+    for sample, outfile in zip(samples, outfiles):
+        if len(sample) == 0:
+            print("No samples for " + outfile)
+            continue
+        mdtraj.join([frames[(itraj, frame)] for itraj, frame in sample]).save(outfile)
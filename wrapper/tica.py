@@ -1,8 +1,9 @@
 import pyemma
 import numpy as np
 
-from .util import Forcer
-from .feat import pipe_feat, get_feat
+from .util import Forcer, atomic_save, atomic_save_model, start_stage, mark_done, stage_done
+from .feat import pipe_feat, source_feat, get_feat
+from .prefetch import PrefetchReader, lagged_windows, map_chunks
 
 
 def pipe_tica(traj_list, feat, files, lag=2, var_cutoff=0.95, forceFeat=False):
@@ -35,8 +36,45 @@ def pipe_tica(traj_list, feat, files, lag=2, var_cutoff=0.95, forceFeat=False):
     return pipe
 
 
+def stream_tica(traj_list, feat, files, lag=2, var_cutoff=0.95, forceFeat=False, prefetch=2, chunksize=5000):
+    """Estimate time-lagged independent components chunk by chunk
+
+    The features are read ahead on a background thread and fed to the
+    estimator in chunks. Each chunk is prepended with the last lag
+    frames of its predecessor, so no time-lagged pair is lost at the
+    chunk boundaries.
+
+    Parameters
+    ----------
+    traj_list : list of strings
+        MD trajectory file names
+    feat : class pyemma.coordinate.MDFeaturize
+       User specified features.
+    files : dict
+        File names for data in or to storage.
+    lag : int (default 2)
+        Lagtime for tICA analysis.
+    var_cutoff : float (default 0.95)
+        Defines the cutoff based on cumulative variance of the tICA.
+    forceFeat : bool
+        Whether features should be recalculated.
+    prefetch : int (2)
+        Number of chunks read ahead.
+    chunksize : int (5000)
+        Number of frames per chunk.
+    """
+    inp = source_feat(traj_list, feat, files, forceFeat, chunksize=chunksize)
+
+    tica_obj = pyemma.coordinates.tica(lag=lag, var_cutoff=var_cutoff, kinetic_map=True)
+    for itraj, window in lagged_windows(PrefetchReader(inp, chunksize=chunksize, prefetch=prefetch), lag):
+        tica_obj.partial_fit(window)
+    print("tICA from prefetched stream.")
+
+    return inp, tica_obj
+
+
 def get_tica(traj_list, feat, files, lag=2, var_cutoff=0.95, ndims=1e6,
-             pipeline=False, forceCalc=False, forceModel=False, forceFeat=False):
+             pipeline=False, forceCalc=False, forceModel=False, forceFeat=False, prefetch=2, chunksize=5000):
     """Wrapper for time-lagged independent component analyses
 
     We choose different sources based on user decision and available
@@ -45,6 +83,10 @@ def get_tica(traj_list, feat, files, lag=2, var_cutoff=0.95, ndims=1e6,
     data from storage. If the data can not be found on storage, it is
     calculated from a stored model or newly created model.
 
+    Artifacts are stored atomically and tracked in a progress manifest
+    next to files['ticaFile']. If a job was killed after storing the
+    model, the next run resumes from the model.
+
     Parameters
     ----------
     traj_list : list of strings
@@ -72,10 +114,22 @@ def get_tica(traj_list, feat, files, lag=2, var_cutoff=0.95, ndims=1e6,
         Whether tICA should be (re-)modeled.
     forceFeat : bool
         Whether features should be recalculated.
+    prefetch : int (2)
+        Number of chunks read ahead in pipelining and featurization,
+        0 falls back to the PyEMMA pipeline.
+    chunksize : int (5000)
+        Number of frames per chunk.
     """
     ########################################################
     # Create TICA object if memory is too small for data
     ########################################################
+    if pipeline and prefetch > 0:
+        inp, tica_obj = stream_tica(traj_list, feat, files, lag=lag, var_cutoff=var_cutoff, forceFeat=forceFeat,
+                                    prefetch=prefetch, chunksize=chunksize)
+        tica_output = map_chunks(inp, tica_obj.transform, chunksize=chunksize, prefetch=prefetch)
+
+        return tica_obj, tica_output
+
     if pipeline:
         pipe = pipe_feat(traj_list, feat, files, forceFeat)
 
@@ -92,7 +146,7 @@ def get_tica(traj_list, feat, files, lag=2, var_cutoff=0.95, ndims=1e6,
     # Get TICA ...
     try:
         try:
-            if forceFeat or forceCalc or forceModel:
+            if forceFeat or forceCalc or forceModel or not stage_done(files['ticaFile']):
                 raise Forcer()
 
             tica_obj = pyemma.load(files['ticaModel'])
@@ -106,27 +160,35 @@ def get_tica(traj_list, feat, files, lag=2, var_cutoff=0.95, ndims=1e6,
             return tica_obj, tica_output
     # ... from data ...
         except:
-            if forceFeat or forceCalc:
+            if forceFeat or forceCalc or not stage_done(files['ticaFile'], 'ticaModel'):
                 raise Forcer()
 
             tica_obj = pyemma.load(files['ticaModel'])
-            inp = get_feat(traj_list, feat, files, forceFeat)
+            inp = get_feat(traj_list, feat, files, forceFeat, prefetch=prefetch, chunksize=chunksize)
             tica_output = tica_obj.transform(inp)
             print("tICs from model")
 
+            if not stage_done(files['ticaFile']):
+                atomic_save(files['ticaFile'], tica_output)
+                atomic_save(files['cumvarFile'], tica_obj.cumvar)
+                mark_done(files['ticaFile'])
+
             return tica_obj, tica_output
     # ... from model ...
 
     except:
-        inp = get_feat(traj_list, feat, files, forceFeat)
+        inp = get_feat(traj_list, feat, files, forceFeat, prefetch=prefetch, chunksize=chunksize)
 
         tica_obj = pyemma.coordinates.tica(inp, lag=lag, var_cutoff=var_cutoff, kinetic_map=True)
         tica_output = tica_obj.get_output()
         print("tICs from calculation")
 
-        tica_obj.save(files['ticaModel'], overwrite=True)
-        np.save(files['ticaFile'], tica_output)
-        np.save(files['cumvarFile'], tica_obj.cumvar)
+        start_stage(files['ticaFile'])
+        atomic_save_model(tica_obj, files['ticaModel'])
+        mark_done(files['ticaFile'], 'ticaModel')
+        atomic_save(files['ticaFile'], tica_output)
+        atomic_save(files['cumvarFile'], tica_obj.cumvar)
+        mark_done(files['ticaFile'])
 
         return tica_obj, tica_output
     # ... or calculate it.
@@ -0,0 +1,129 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, CancelledError, as_completed
+
+import numpy as np
+import pyemma
+
+from .util import atomic_save, load_manifest, save_manifest
+from .prefetch import map_chunks
+
+
+_worker = {}
+
+
+def _init_worker(feat, ticaModel, clusterModel):
+    """Load the models once per worker process"""
+    _worker['feat'] = feat
+    _worker['tica'] = pyemma.load(ticaModel)
+    _worker['cluster'] = pyemma.load(clusterModel)
+
+
+def _transform_traj(traj, outfile, prefetch=2, chunksize=5000):
+    """Discretize a single trajectory chunk by chunk and store its dtraj"""
+    tica_obj, cluster_obj = _worker['tica'], _worker['cluster']
+    inp = pyemma.coordinates.source([traj], features=_worker['feat'], chunksize=chunksize)
+    ndims = cluster_obj.clustercenters.shape[1]
+
+    dtraj = map_chunks(inp, lambda X: cluster_obj.assign(tica_obj.transform(X)[:, :ndims]),
+                       chunksize=chunksize, prefetch=prefetch)[0]
+    atomic_save(outfile, np.asarray(dtraj, dtype='int32'))
+
+    return len(dtraj)
+
+
+def dtraj_file(traj, files):
+    """Name of the dtraj of a transformed trajectory
+
+    Parameters
+    ----------
+    traj : string
+        MD trajectory file name
+    files : dict
+        File names for data in or to storage.
+        Important:
+        - files['transformDtraj']
+    """
+    return files['transformDtraj'] + os.path.splitext(os.path.basename(traj))[0] + '.npy'
+
+
+def transform_trajs(traj_list, feat, files, nworkers=4, prefetch=2, chunksize=5000, force=False):
+    """Discretize new trajectories with the stored tICA and KMeans models
+
+    The trajectories are featurized, projected and assigned chunk by
+    chunk on a pool of worker processes, thus, neither the features nor
+    the tICs are held in memory. Every dtraj is named after its
+    trajectory and stored atomically. The progress manifest maps each
+    dtraj to the trajectory it was calculated from; trajectories
+    recorded there with an existing dtraj are skipped, and a dtraj
+    recorded for a trajectory with another path raises a ValueError.
+
+    Parameters
+    ----------
+    traj_list : list of strings
+        MD trajectory file names, their base names have to be unique.
+    feat : class pyemma.coordinate.Featurize
+        User specified features, the same as for the stored models.
+    files : dict
+        File names for data in or to storage.
+        Important:
+        - files['ticaModel']
+        - files['clusterModel']
+        - files['transformDtraj']
+    nworkers : int (4)
+        Number of trajectories transformed concurrently.
+    prefetch : int (2)
+        Number of chunks read ahead per worker.
+    chunksize : int (5000)
+        Number of frames per chunk.
+    force : bool (False)
+        Whether already transformed trajectories should be recalculated.
+    """
+    dtrajFile_list = [dtraj_file(traj, files) for traj in traj_list]
+    if len(set(dtrajFile_list)) != len(dtrajFile_list):
+        raise ValueError("Trajectory base names are not unique, their dtrajs would overwrite each other.")
+
+    manifest = load_manifest(files['transformDtraj']) or {'trajs': {}}
+    todo = []
+    for i, (traj, dtrajFile) in enumerate(zip(traj_list, dtrajFile_list)):
+        recorded = manifest['trajs'].get(os.path.basename(dtrajFile))
+        if recorded is not None and recorded != os.path.abspath(traj):
+            raise ValueError("The dtraj " + dtrajFile + " belongs to " + recorded + ", not to " + traj)
+        if force or recorded is None or not os.path.isfile(dtrajFile):
+            todo.append(i)
+    print("Transform {} of {} trajectories".format(len(todo), len(traj_list)))
+
+    nframes = 0
+    failed = None
+    start = time.time()
+    pool = ProcessPoolExecutor(max_workers=nworkers, initializer=_init_worker,
+                               initargs=(feat, files['ticaModel'], files['clusterModel']))
+    try:
+        futures = {pool.submit(_transform_traj, traj_list[i], dtrajFile_list[i],
+                               prefetch=prefetch, chunksize=chunksize): i for i in todo}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                nframes += future.result()
+            except CancelledError:
+                continue
+            except Exception as err:
+                if failed is None:
+                    failed = (traj_list[i], err)
+                    for pending in futures:
+                        pending.cancel()
+                continue
+
+            manifest['trajs'][os.path.basename(dtrajFile_list[i])] = os.path.abspath(traj_list[i])
+            save_manifest(files['transformDtraj'], manifest)
+            print("Transformed " + traj_list[i])
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+    elapsed = time.time() - start
+    print("Transformed {} frames in {:.1f} s ({:.0f} frames/s)".format(nframes, elapsed, nframes / max(elapsed, 1e-9)))
+
+    if failed is not None:
+        raise RuntimeError("Transforming " + failed[0] + " failed") from failed[1]
+
+    return dtrajFile_list
@@ -1,3 +1,7 @@
+import os
+import json
+import shutil
+
 import pyemma
 import numpy as np
 
@@ -8,6 +12,165 @@ class Forcer(Exception):
     pass
 
 
+def atomic_save(filename, data):
+    """Save numpy data via write-then-rename
+
+    The data is written to a temporary file next to the target and
+    renamed afterwards, so a killed job never leaves a truncated file.
+
+    Parameters
+    ----------
+    filename : string
+        Target file name (should end with .npy)
+    data : numpy.ndarray or list of numpy.ndarrays
+        Data to be stored.
+    """
+    tmpfile = filename + '.tmp'
+    with open(tmpfile, 'wb') as fh:
+        np.save(fh, data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmpfile, filename)
+
+
+def atomic_savez(filename, **arrays):
+    """Save several numpy arrays into a .npz file via write-then-rename
+
+    Parameters
+    ----------
+    filename : string
+        Target file name (should end with .npz)
+    arrays : numpy.ndarrays
+        Arrays to be stored by keyword.
+    """
+    tmpfile = filename + '.tmp'
+    with open(tmpfile, 'wb') as fh:
+        np.savez(fh, **arrays)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmpfile, filename)
+
+
+def atomic_save_model(obj, filename):
+    """Save a PyEMMA object via write-then-rename
+
+    PyEMMA stores objects by model name inside an HDF5 container. An
+    existing container is copied to the temporary file first, so other
+    models stored in it are kept.
+
+    Parameters
+    ----------
+    obj : pyemma object
+        Estimator or model providing a save method.
+    filename : string
+        Target file name
+    """
+    tmpfile = filename + '.tmp'
+    if os.path.exists(filename):
+        shutil.copyfile(filename, tmpfile)
+    elif os.path.exists(tmpfile):
+        os.remove(tmpfile)
+    obj.save(tmpfile, overwrite=True)
+    os.replace(tmpfile, filename)
+
+
+def manifest_file(filename):
+    """Name of the progress manifest belonging to a stage artifact
+
+    Parameters
+    ----------
+    filename : string
+        Artifact file name or file prefix of the stage
+    """
+    return filename + '.manifest.json'
+
+
+def load_manifest(filename):
+    """Load the progress manifest of a stage
+
+    Returns None if no manifest exists.
+
+    Parameters
+    ----------
+    filename : string
+        Artifact file name or file prefix of the stage
+    """
+    try:
+        with open(manifest_file(filename), 'r') as fh:
+            return json.load(fh)
+    except (IOError, ValueError):
+        return None
+
+
+def save_manifest(filename, manifest):
+    """Atomically store the progress manifest of a stage
+
+    Parameters
+    ----------
+    filename : string
+        Artifact file name or file prefix of the stage
+    manifest : dict
+        Progress information, e.g. {'done': [...], 'complete': False}
+    """
+    target = manifest_file(filename)
+    tmpfile = target + '.tmp'
+    with open(tmpfile, 'w') as fh:
+        json.dump(manifest, fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmpfile, target)
+
+
+def start_stage(filename):
+    """Reset the progress manifest before (re)calculating a stage
+
+    Parameters
+    ----------
+    filename : string
+        Artifact file name or file prefix of the stage
+    """
+    save_manifest(filename, {'done': [], 'complete': False})
+
+
+def mark_done(filename, artifact=None):
+    """Record a finished artifact or, if None, the finished stage
+
+    Parameters
+    ----------
+    filename : string
+        Artifact file name or file prefix of the stage
+    artifact : string (None)
+        Key of the finished artifact, e.g. 'ticaModel'
+    """
+    manifest = load_manifest(filename) or {'done': [], 'complete': False}
+    if artifact is None:
+        manifest['complete'] = True
+    elif artifact not in manifest['done']:
+        manifest['done'].append(artifact)
+    save_manifest(filename, manifest)
+
+
+def stage_done(filename, artifact=None):
+    """Whether a stage or one of its artifacts was finished
+
+    Artifacts without a manifest stem from older runs that wrote
+    their files in one go and are therefore accepted.
+
+    Parameters
+    ----------
+    filename : string
+        Artifact file name or file prefix of the stage
+    artifact : string (None)
+        Key of the artifact to check, if None the whole stage is checked
+    """
+    manifest = load_manifest(filename)
+    if manifest is None:
+        return True
+    if artifact is None:
+        return manifest.get('complete', False)
+    return artifact in manifest.get('done', [])
+
+
 def tica_plot(tica_output, offset, lag=2, output='./'):
     """Plot 2D projection of free energy in tIC space
 